@@ -1,12 +1,17 @@
+import time
 import networkx as nx
 from network_setup import create_network
 from congestion_monitor import NodeMonitor
+from metrics_exporter import RouteStats
+
+HOP_COST = 1e-3   # Tie-breaker in route(): among equal-score paths, prefer fewer hops
 
 
 class AdaptiveRouter:
-    def __init__(self, network, monitors):
+    def __init__(self, network, monitors, stats=None):
         self.network = network
         self.monitors = monitors  # dict: {node_id: NodeMonitor}
+        self.stats = stats if stats is not None else RouteStats()  # latency histogram
 
     def path_cost(self, path):
         """
@@ -22,20 +27,29 @@ class AdaptiveRouter:
                 total += self.monitors[node].get_routing_score()
         return total
 
-    def find_best_path(self, source, destination):
-        """Find the least congested path, rerouting at prediction stage."""
+    def find_best_path(self, source, destination, verbose=True):
+        """Find the least congested path, rerouting at prediction stage.
+
+        Enumerates every simple path, so it is only practical on small
+        topologies; use route() when routing every tick or on large graphs.
+        With verbose=False the per-path breakdown is not printed.
+        """
+        start = time.perf_counter()
         try:
             all_paths = list(nx.all_simple_paths(self.network, source, destination))
         except nx.NetworkXNoPath:
-            print(f'No path found between {source} and {destination}!')
-            return None
+            all_paths = []
 
         if not all_paths:
-            print(f'No path found between {source} and {destination}!')
+            self.stats.observe_latency(time.perf_counter() - start)
+            if verbose:
+                print(f'No path found between {source} and {destination}!')
             return None
 
         best_path = min(all_paths, key=self.path_cost)
-        best_cost = self.path_cost(best_path)
+        self.stats.observe_latency(time.perf_counter() - start)
+        if not verbose:
+            return best_path
 
         print(f'\nAll paths from Node {source} to Node {destination}:')
         for path in all_paths:
@@ -56,6 +70,26 @@ class AdaptiveRouter:
 
         return best_path
 
+    def route(self, source, destination):
+        """
+        Least-cost path by Dijkstra, charging each node's routing score on
+        entry (plus HOP_COST per hop). Minimises the same cost as
+        find_best_path without enumerating paths, so it scales to large
+        topologies. Returns None if there is no path.
+        """
+        start = time.perf_counter()
+
+        def weight(u, v, data):
+            m = self.monitors.get(v)
+            return (m.get_routing_score() if m is not None else 0) + HOP_COST
+
+        try:
+            path = nx.dijkstra_path(self.network, source, destination, weight=weight)
+        except (nx.NetworkXNoPath, nx.NodeNotFound):
+            path = None
+        self.stats.observe_latency(time.perf_counter() - start)
+        return path
+
 
 if __name__ == '__main__':
     print("--- Testing Adaptive Routing with Early Prediction ---\n")
@@ -76,5 +110,6 @@ if __name__ == '__main__':
     router = AdaptiveRouter(network, monitors)
     best = router.find_best_path(1, 6)
     print(f'\nChosen path: {best}')
+    print(f'Dijkstra route: {router.route(1, 6)}')
     print('\nNote: Rerouting triggered by PREDICTION on Node 2,')
     print('before it ever became fully congested.')
\ No newline at end of file
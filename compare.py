@@ -8,51 +8,119 @@ Runs the simulation TWICE with identical traffic and random seed:
           reducing queue growth on heavy nodes.
 """
 
+import math
 import networkx as nx
-import random
+import os
 import simpy
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 import numpy as np
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
 from network_setup import create_network
 from congestion_monitor import NodeMonitor
+from rng_streams import NodeStreams
+from run_length import RunLengthController, print_report
+from metrics_exporter import RouteStats
+from workload import drain_capacity
 
 RANDOM_SEED   = 42
 SIM_DURATION  = 80
 TRAFFIC_RATES = {1: 5, 2: 15, 3: 5, 4: 12, 5: 5, 6: 5}
 
-# Base drain rates per node - calculated dynamically
-BASE_DRAIN = {}
-for node_id, rate in TRAFFIC_RATES.items():
-    BASE_DRAIN[node_id] = rate + 2  # Drain 2 more than arrival
-    if rate > 10:
-        BASE_DRAIN[node_id] = rate + 3  # Extra buffer for busy nodes
+# Base drain rates per node - calculated dynamically (2-3 more than arrival)
+BASE_DRAIN = drain_capacity(TRAFFIC_RATES)
 
 # Soft / hard queue thresholds (used for plotting and comparison)
 QUEUE_SOFT = 6
 QUEUE_HARD = 10
 
+# Comparison chart size (inches); its pixel width caps the plotted time columns
+FIGSIZE = (18, 14)
+BUSIEST = 4   # Busiest nodes listed individually in the improvement summary
+
+# Best paths remembered per router (least recently used evicted first)
+ROUTE_CACHE_SIZE = 1024
+
 class Router:
-    def __init__(self, network, monitors):
+    def __init__(self, network, monitors, stats=None):
         self.network  = network
         self.monitors = monitors
+        self.stats    = stats if stats is not None else RouteStats()
+        self.paths    = {}   # (src, dst) -> (simple paths, nodes on them); topology is static
+        self.cache    = OrderedDict()   # (src, dst, scores of path nodes) -> best path, LRU
 
     def path_cost(self, path):
         return sum(self.monitors[n].get_routing_score() for n in path if n in self.monitors)
 
     def best_path(self, src, dst):
-        paths = list(nx.all_simple_paths(self.network, src, dst))
-        if not paths: return [src, dst]
-        return min(paths, key=self.path_cost)
-
-
-def run_sim(early_prediction, seed):
-    random.seed(seed)
+        start = time.perf_counter()
+        if (src, dst) not in self.paths:
+            paths = list(nx.all_simple_paths(self.network, src, dst))
+            on_path = sorted({n for p in paths for n in p if n in self.monitors})
+            self.paths[(src, dst)] = (paths, on_path)
+        paths, on_path = self.paths[(src, dst)]
+
+        # Best path only changes when the score of a node on some candidate path changes
+        key = (src, dst, tuple(self.monitors[n].get_routing_score() for n in on_path))
+        best = self.cache.get(key)
+        if best is not None:
+            self.stats.cache_hits += 1
+            self.cache.move_to_end(key)
+            return best
+
+        # Only real computations (misses) go into the latency histogram
+        self.stats.cache_misses += 1
+        best = min(paths, key=self.path_cost) if paths else [src, dst]
+        self.stats.observe_latency(time.perf_counter() - start)
+
+        self.cache[key] = best
+        if len(self.cache) > ROUTE_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return best
+
+
+def run_sim(early_prediction, seed, precision=None, max_duration=None,
+            exporter=None, run=None, workload=None):
+    """Run one comparison simulation.
+
+    By default the run lasts SIM_DURATION seconds. If `precision` is given
+    (target relative CI half-width, e.g. 0.05), the run length is chosen
+    adaptively: warm-up is truncated (MSER-5) and the run stops once the
+    per-node queue averages reach that precision or `max_duration` runs out.
+
+    If `exporter` (a MetricsExporter) is given, the live monitors and router
+    stats are attached to it under the label `run` so they can be scraped.
+
+    If `workload` (a workload.Workload over the network's nodes) is given,
+    arrival rates change every tick instead of using TRAFFIC_RATES; drain
+    capacity comes from the workload's base rates.
+    """
     env      = simpy.Environment()
     network  = create_network()
     monitors = {n: NodeMonitor(n) for n in network.nodes()}
+    rng      = NodeStreams(seed, network.nodes())
     router   = Router(network, monitors)
 
+    rates       = dict(TRAFFIC_RATES)
+    drain_rates = BASE_DRAIN
+    load        = None
+    if workload is not None:
+        missing = set(network.nodes()) - set(workload.nodes)
+        if missing:
+            raise ValueError(f'Workload has no rates for nodes {sorted(missing)}')
+        rates       = dict(zip(workload.nodes, workload.base_rates.tolist()))
+        drain_rates = drain_capacity(rates)
+        load        = workload.stream()
+        # Tick 0 covers [0, 1); drain_and_record applies tick k at t=k
+        rates.update(zip(workload.nodes, next(load)[1].tolist()))
+
+    if exporter is not None:
+        label = run or ('predicted' if early_prediction else 'baseline')
+        exporter.attach(label, monitors, router.stats)
+
     results = {
         'queue_history':    {n: [] for n in network.nodes()},
         'delay_history':    {n: [] for n in network.nodes()},
@@ -67,9 +135,17 @@ def run_sim(early_prediction, seed):
 
     prev_path = [None]
 
-    def packet_generator(node_id, monitor, rate):
+    def packet_generator(node_id, monitor):
         while True:
-            yield env.timeout(random.expovariate(rate))
+            rate = rates[node_id]
+            gap  = rng.interarrival(node_id, rate) if rate > 0 else math.inf
+            if load is not None:
+                # Rate changes every tick: redraw at the boundary (memoryless)
+                boundary = math.floor(env.now) + 1.0
+                if env.now + gap > boundary:
+                    yield env.timeout(boundary - env.now)
+                    continue
+            yield env.timeout(gap)
 
             # if we're doing early prediction and the node is currently
             # predicted or congested, assume SDN-like controller reroutes the
@@ -77,11 +153,11 @@ def run_sim(early_prediction, seed):
             if early_prediction and (monitor.predicted or monitor.congested):
                 results['rerouted_packets'] += 1
                 # still update traffic_rate noise for consistency
-                monitor.traffic_rate  = int(rate * 10) + random.randint(-3, 3)
+                monitor.traffic_rate  = int(rate * 10) + rng.rate_noise(node_id)
                 continue
 
             monitor.queue_length += 1
-            monitor.traffic_rate  = int(rate * 10) + random.randint(-3, 3)
+            monitor.traffic_rate  = int(rate * 10) + rng.rate_noise(node_id)
             monitor.delay         = monitor.queue_length * 0.005
 
             # Baseline: congested nodes keep receiving full traffic — drop packets
@@ -93,21 +169,25 @@ def run_sim(early_prediction, seed):
         while True:
             yield env.timeout(1.0)
 
+            if load is not None:
+                _, tick_rates = next(load)
+                rates.update(zip(workload.nodes, tick_rates.tolist()))
+
             for n, monitor in monitors.items():
 
                 # Normal drain — same for both runs
-                drain = random.randint(BASE_DRAIN[n] - 1, BASE_DRAIN[n] + 1)
+                drain = drain_rates[n] + rng.drain_jitter(n)
 
                 # If early prediction is enabled and this node is predicted/congested,
                 # model traffic being redirected away by applying an extra small drain.
                 extra_drain = 0
                 if early_prediction and (monitor.predicted or monitor.congested):
-                    extra_drain = random.randint(1, 3)
+                    extra_drain = rng.extra_drain(n)
 
                 monitor.queue_length = max(0, monitor.queue_length - drain - extra_drain)
 
                 # Recompute instantaneous metrics used by prediction
-                monitor.traffic_rate = int(TRAFFIC_RATES[n] * 10) + random.randint(-3, 3)
+                monitor.traffic_rate = int(rates[n] * 10) + rng.rate_noise(n)
                 monitor.delay = monitor.queue_length * 0.005
                 monitor.predict_congestion()  # Now this works with current values
 
@@ -122,21 +202,44 @@ def run_sim(early_prediction, seed):
             current_path = router.best_path(1, 6)
             if current_path != prev_path[0]:
                 results['reroutes'] += 1
+                router.stats.reroutes += 1
                 results['reroute_times'].append(env.now)
                 prev_path[0] = current_path
 
-    for node_id, rate in TRAFFIC_RATES.items():
-        env.process(packet_generator(node_id, monitors[node_id], rate))
+    # Started first so that at every tick boundary the new rates are applied
+    # before any generator wakes up there and redraws its gap
     env.process(drain_and_record())
-    env.run(until=SIM_DURATION)
+    for node_id, monitor in monitors.items():
+        env.process(packet_generator(node_id, monitor))
+
+    if precision is None:
+        env.run(until=SIM_DURATION)
+        results['precision'] = None
+    else:
+        controller = RunLengthController(rel_precision=precision)
+        if max_duration is not None:
+            controller.max_duration = max_duration
+
+        def key_metrics():
+            qh = results['queue_history']
+            series = {f'queue_n{n}': qh[n] for n in network.nodes()}
+            series['queue_mean'] = np.mean([qh[n] for n in network.nodes()], axis=0)
+            return series
+
+        results['precision'] = controller.run(env, key_metrics)
 
     results['monitors']   = monitors
     results['final_path'] = router.best_path(1, 6)
+    results['route_stats'] = router.stats
 
-    # Compute stats for ALL 6 nodes
+    # Compute stats for ALL 6 nodes (adaptive runs: after each node's warm-up,
+    # so they match the means in results['precision'])
     for n in network.nodes():
-        qh = results['queue_history'][n]
-        dh = results['delay_history'][n]
+        warmup = 0
+        if results['precision'] is not None:
+            warmup = results['precision']['metrics'][f'queue_n{n}']['warmup']
+        qh = results['queue_history'][n][warmup:]
+        dh = results['delay_history'][n][warmup:]
         results[f'avg_queue_n{n}']  = np.mean(qh) if qh else 0
         results[f'peak_queue_n{n}'] = max(qh) if qh else 0
         results[f'avg_delay_n{n}']  = np.mean(dh) if dh else 0
@@ -156,10 +259,121 @@ def print_summary(label, r):
     print(f"  Rerouting events       : {r['reroutes']}")
     if r['reroute_times']:
         print(f"  First reroute at       : t={r['reroute_times'][0]:.1f}s")
+    if 'route_stats' in r:
+        print(f"  Route cache hit rate   : {r['route_stats'].hit_ratio() * 100:.1f}%")
+    if r.get('precision'):
+        print_report(r['precision'])
+
+
+def plot_data(runs, max_points=None, ticks=None, max_rows=None, track=()):
+    """
+    Slim, picklable view of one or more runs (e.g. several seeds) for plotting.
+    Runs are trimmed to `ticks` (default: the shortest run) so adaptive-length
+    runs can be combined. Every statistic is computed on the full-resolution
+    (runs, nodes, ticks) queue histories, then binned down to at most
+    `max_points` time columns and `max_rows` node rows, so only figure-sized
+    arrays leave this function. Full-resolution averages are kept for the
+    BUSIEST nodes of this side plus any nodes in `track`.
+    """
+    if isinstance(runs, dict):
+        runs = [runs]
+    nodes = sorted(runs[0]['queue_history'])
+    if ticks is None:
+        ticks = min(len(r['time_labels']) for r in runs)
+    time  = np.asarray(runs[0]['time_labels'][:ticks], dtype=float)
+    queue = np.array([[r['queue_history'][n][:ticks] for n in nodes] for r in runs],
+                     dtype=float)
+    flat  = queue.reshape(-1, ticks)   # every (run, node) series
+    max_points = max_points or ticks
+    max_rows   = max_rows or len(nodes)
+
+    heat, t   = reduce_time(queue.mean(axis=0), time, max_points, 'mean')
+    heat, _   = reduce_bins(heat, max_rows, 'mean', axis=0)
+    bands, _  = reduce_time(np.percentile(flat, [10, 50, 90], axis=0), time, max_points, 'mean')
+    peak, _   = reduce_time(flat.max(axis=0), time, max_points, 'max')
+    avgs      = queue.mean(axis=(0, 2))
+    busiest   = [nodes[i] for i in np.argsort(avgs)[::-1][:BUSIEST]]
+    index     = {n: i for i, n in enumerate(nodes)}
+    return {
+        'nodes':         nodes if len(nodes) <= max_rows else None,   # ids, if one row each
+        'n_nodes':       len(nodes),
+        'time':          t,
+        't_end':         float(time[-1]) if ticks else 0.0,
+        'binned':        ticks > max_points,
+        'nodes_binned':  len(nodes) > max_rows,
+        'heat':          heat,    # (rows, columns) seed-mean queue, bin mean
+        'bands':         bands,   # (3, columns) p10/p50/p90 across nodes and seeds, bin mean
+        'peak':          peak,    # (columns,) max across nodes and seeds, bin max
+        'node_avgs':     reduce_bins(avgs, max_rows, 'mean')[0],   # per row of heat
+        'avg_all':       float(avgs.mean()) if len(avgs) else 0.0,
+        'busiest':       busiest,
+        'tracked':       {n: float(avgs[index[n]]) for n in (*busiest, *track) if n in index},
+        'p95':           float(np.percentile(queue, 95)),
+        'dropped':       np.mean([r['dropped_total'] for r in runs]),
+        'congested':     np.mean([r['congested_events'] for r in runs]),
+        'first_reroute': min((r['reroute_times'][0] for r in runs if r['reroute_times']),
+                             default=None),
+        'runs':          len(runs),
+    }
 
 
-def plot_comparison(baseline, predicted):
-    fig = plt.figure(figsize=(18, 14))
+def plot_pair(baseline, predicted, dpi):
+    """plot_data for both sides, trimmed to a common length and the figure size."""
+    runs = [r for side in (baseline, predicted)
+            for r in ([side] if isinstance(side, dict) else side)]
+    ticks = min(len(r['time_labels']) for r in runs)
+    # Never draw more columns / rows than a heatmap (a third of the figure
+    # height) has pixels
+    max_points = int(FIGSIZE[0] * dpi)
+    max_rows   = int(FIGSIZE[1] * dpi / 3)
+    base = plot_data(baseline, max_points, ticks, max_rows)
+    pred = plot_data(predicted, max_points, ticks, max_rows, track=base['busiest'])
+    return base, pred
+
+
+def reduce_bins(values, max_bins, how='max', axis=-1):
+    """
+    Bin `axis` of `values` down to at most `max_bins` contiguous bins.
+    Returns (binned values, start index of each bin). how='max' keeps the
+    per-bin maximum so short congestion spikes survive; how='mean' keeps the
+    per-bin average (for averages and percentiles, which a max would bias
+    upward).
+    """
+    size = values.shape[axis]
+    if size <= max_bins:
+        return values, np.arange(size)
+    edges = np.linspace(0, size, max_bins + 1).astype(int)[:-1]
+    if how == 'max':
+        return np.maximum.reduceat(values, edges, axis=axis), edges
+    counts = np.diff(np.append(edges, size))
+    shape = [1] * values.ndim
+    shape[axis] = len(counts)
+    return np.add.reduceat(values, edges, axis=axis) / counts.reshape(shape), edges
+
+
+def reduce_time(values, time, max_points, how='max'):
+    """Bin the last (time) axis down to at most `max_points` columns (see reduce_bins)."""
+    binned, edges = reduce_bins(values, max_points, how)
+    return binned, time[edges]
+
+
+def plot_comparison(baseline, predicted, path='comparison.png', show=False, dpi=150):
+    """
+    Render the baseline vs early-prediction comparison chart to `path`.
+
+    `baseline` / `predicted` are run_sim results, or lists of them (one per
+    seed). Queues are drawn as node-by-time heatmaps plus percentile bands, so
+    the figure size does not grow with the topology. With show=False (the
+    default) no pyplot window is created, which is safe for headless batch jobs.
+    """
+    return _draw(*plot_pair(baseline, predicted, dpi), path, show, dpi)
+
+
+def _draw(base, pred, path, show, dpi):
+    if show:
+        fig = plt.figure(figsize=FIGSIZE)
+    else:
+        fig = Figure(figsize=FIGSIZE)   # no pyplot state, no GUI backend
     fig.patch.set_facecolor('#0a0e1a')
 
     gs = gridspec.GridSpec(3, 3, figure=fig, hspace=0.5, wspace=0.35)
@@ -182,50 +396,76 @@ def plot_comparison(baseline, predicted):
             spine.set_edgecolor(GRID)
         ax.grid(True, color=GRID, linewidth=0.5, alpha=0.6)
 
+    seeds = f' · {base["runs"]} seeds' if base['runs'] > 1 else ' · Same random seed'
     fig.suptitle(
         'Early Congestion Prediction vs Traditional Reactive Routing\n'
-        'Same network · Same traffic · Same random seed',
+        f'Same network · Same traffic{seeds}',
         color='white', fontsize=13, fontweight='bold', y=0.99
     )
 
-    t = baseline['time_labels']
-
-    # ── Row 0: Queue for all 6 nodes ──────────────────────────
-    for i, n in enumerate([1, 2, 3, 4, 5, 6]):
-        row = i // 3
-        col = i % 3
-        ax = fig.add_subplot(gs[row, col])
-        ax.plot(t, baseline['queue_history'][n],  color=C_BASE, lw=1.4, label='No Prediction')
-        ax.plot(t, predicted['queue_history'][n], color=C_PRED, lw=1.4, label='Early Prediction')
-        ax.axhline(QUEUE_SOFT, color=C_SOFT, lw=1, ls='--', label=f'Predict ({QUEUE_SOFT})')
-        ax.axhline(QUEUE_HARD, color=C_HARD, lw=1, ls=':',  label=f'Congest ({QUEUE_HARD})')
-        ax.set_ylabel('Queue (pkts)', color=TEXT, fontsize=8)
+    nodes   = base['nodes']
+    n_nodes = base['n_nodes']
+    t       = base['time']
+    t_end = base['t_end']
+    binned = ' (bin mean)' if base['binned'] else ''
+    seed_mean = 'Mean ' if base['runs'] > 1 else ''
+
+    # ── Rows 0-1: node-by-time queue heatmaps (mean over seeds) ─
+    vmax = max(base['heat'].max(initial=0), pred['heat'].max(initial=0), QUEUE_HARD)
+    for row, (label, d) in enumerate([('No Prediction', base), ('Early Prediction', pred)]):
+        ax = fig.add_subplot(gs[row, 0:3])
+        im = ax.imshow(d['heat'], aspect='auto', interpolation='nearest',
+                       cmap='inferno', vmin=0, vmax=vmax, origin='lower',
+                       extent=(t[0] if len(t) else 0, t_end, -0.5, n_nodes - 0.5))
+        if nodes is not None and n_nodes <= 20:
+            ax.set_yticks(range(n_nodes))
+            ax.set_yticklabels([f'N{n}' for n in nodes])
+        node_axis = 'Node (rows averaged)' if base['nodes_binned'] else 'Node'
+        ax.set_ylabel(node_axis, color=TEXT, fontsize=8)
         ax.set_xlabel('Time (s)', color=TEXT, fontsize=8)
-        ax.legend(fontsize=6, facecolor=BG, labelcolor=TEXT, loc='upper left')
-        style_ax(ax, f'Queue Length — Node {n}')
-
-    # ── Row 2: Bar comparison + improvement summary ────────────
-    ax_bar = fig.add_subplot(gs[2, 0:2])
-
-    nodes = [1, 2, 3, 4, 5, 6]
-    base_avgs = [round(baseline[f'avg_queue_n{n}'], 2) for n in nodes]
-    pred_avgs = [round(predicted[f'avg_queue_n{n}'], 2) for n in nodes]
-
-    x = np.arange(len(nodes))
-    w = 0.35
-    b1 = ax_bar.bar(x - w/2, base_avgs, w, color=C_BASE, alpha=0.85, label='No Prediction',    edgecolor='white', lw=0.5)
-    b2 = ax_bar.bar(x + w/2, pred_avgs, w, color=C_PRED,  alpha=0.85, label='Early Prediction', edgecolor='white', lw=0.5)
-    ax_bar.set_xticks(x)
-    ax_bar.set_xticklabels([f'Node {n}' for n in nodes], color=TEXT, fontsize=9)
-    ax_bar.set_ylabel('Avg Queue Length (pkts)', color=TEXT)
-    ax_bar.legend(fontsize=9, facecolor=BG, labelcolor=TEXT)
-    for bar in b1:
-        h = bar.get_height()
-        ax_bar.text(bar.get_x()+bar.get_width()/2, h+0.1, f'{h:.1f}', ha='center', color=TEXT, fontsize=7)
-    for bar in b2:
-        h = bar.get_height()
-        ax_bar.text(bar.get_x()+bar.get_width()/2, h+0.1, f'{h:.1f}', ha='center', color=TEXT, fontsize=7)
-    style_ax(ax_bar, 'Avg Queue Length Per Node — All 6 Nodes\n(Lower = Better, Early Prediction Should Be Lower on Heavy Nodes)')
+        cbar = fig.colorbar(im, ax=ax, pad=0.01)
+        cbar.ax.tick_params(colors=TEXT, labelsize=7)
+        cbar.set_label(f'{seed_mean}Queue (pkts){binned}', color=TEXT, fontsize=8)
+        style_ax(ax, f'{seed_mean}Queue Length{binned} — All Nodes — {label}')
+        ax.grid(False)
+
+    # ── Row 2: percentile bands across nodes (and seeds) ────────
+    ax_band = fig.add_subplot(gs[2, 0])
+    for label, d, color in [('No Prediction', base, C_BASE), ('Early Prediction', pred, C_PRED)]:
+        p10, p50, p90 = d['bands']
+        ax_band.fill_between(t, p10, p90, color=color, alpha=0.25, lw=0)
+        ax_band.plot(t, p50, color=color, lw=1.2, label=f'{label} (median, p10–p90{binned})')
+        ax_band.plot(t, d['peak'], color=color, lw=0.6, ls=':', alpha=0.8)
+    ax_band.axhline(QUEUE_SOFT, color=C_SOFT, lw=1, ls='--', label=f'Predict ({QUEUE_SOFT})')
+    ax_band.axhline(QUEUE_HARD, color=C_HARD, lw=1, ls=':',  label=f'Congest ({QUEUE_HARD})')
+    ax_band.set_ylabel('Queue (pkts)', color=TEXT, fontsize=8)
+    ax_band.set_xlabel('Time (s)', color=TEXT, fontsize=8)
+    ax_band.legend(fontsize=6, facecolor=BG, labelcolor=TEXT, loc='upper left')
+    peak = 'bin max' if base['binned'] else 'max'
+    style_ax(ax_band, f'Queue Percentiles Across Nodes\n(dotted = {peak})')
+
+    # ── Per-node average: bars for small topologies, scatter for large ─
+    ax_bar = fig.add_subplot(gs[2, 1])
+    base_avgs = base['node_avgs']
+    pred_avgs = pred['node_avgs']
+
+    if n_nodes <= 12:
+        x = np.arange(n_nodes)
+        w = 0.35
+        ax_bar.bar(x - w/2, base_avgs, w, color=C_BASE, alpha=0.85, label='No Prediction',    edgecolor='white', lw=0.5)
+        ax_bar.bar(x + w/2, pred_avgs, w, color=C_PRED, alpha=0.85, label='Early Prediction', edgecolor='white', lw=0.5)
+        ax_bar.set_xticks(x)
+        ax_bar.set_xticklabels([f'N{n}' for n in nodes], color=TEXT, fontsize=8)
+        ax_bar.set_ylabel('Avg Queue Length (pkts)', color=TEXT)
+        ax_bar.legend(fontsize=7, facecolor=BG, labelcolor=TEXT)
+    else:
+        lim = max(base_avgs.max(initial=0), pred_avgs.max(initial=0)) * 1.05 or 1
+        ax_bar.scatter(base_avgs, pred_avgs, s=6, color=C_PRED, alpha=0.6)
+        ax_bar.plot([0, lim], [0, lim], color=TEXT, lw=0.8, ls='--')
+        ax_bar.set_xlabel('No Prediction (pkts)', color=TEXT, fontsize=8)
+        ax_bar.set_ylabel('Early Prediction (pkts)', color=TEXT, fontsize=8)
+    per = 'Per Node Group' if base['nodes_binned'] else 'Per Node'
+    style_ax(ax_bar, f'Avg Queue Length {per}\n(Lower = Better)')
 
     # ── Improvement summary panel ──────────────────────────────
     ax_sum = fig.add_subplot(gs[2, 2])
@@ -248,12 +488,15 @@ def plot_comparison(baseline, predicted):
                 ha='center', va='top', color=TEXT, fontsize=8,
                 transform=ax_sum.transAxes)
 
+    # Busiest nodes (by baseline average) stand in for the full per-node list
     improvements = [
-        ('Packets Dropped',    pct(baseline['dropped_total'],    predicted['dropped_total'])),
-        ('Congestion Events',  pct(baseline['congested_events'], predicted['congested_events'])),
+        ('Packets Dropped',    pct(base['dropped'],   pred['dropped'])),
+        ('Congestion Events',  pct(base['congested'], pred['congested'])),
+        ('Avg Queue (all)',    pct(base['avg_all'],   pred['avg_all'])),
+        ('p95 Queue (all)',    pct(base['p95'],         pred['p95'])),
     ] + [
-        (f'Avg Queue Node {n}', pct(baseline[f'avg_queue_n{n}'], predicted[f'avg_queue_n{n}']))
-        for n in [1, 2, 3, 4, 5, 6]
+        (f'Avg Queue Node {n}', pct(base['tracked'][n], pred['tracked'][n]))
+        for n in base['busiest']
     ]
 
     y_pos = 0.78
@@ -264,14 +507,38 @@ def plot_comparison(baseline, predicted):
         ax_sum.text(0.78, y_pos, f'{symbol} {abs(val):.1f}%', color=color, fontsize=9, fontweight='bold', transform=ax_sum.transAxes)
         y_pos -= 0.082
 
-    if predicted['reroute_times']:
+    if pred['first_reroute'] is not None:
         ax_sum.text(0.5, 0.03,
-                    f'First reroute: t={predicted["reroute_times"][0]:.1f}s',
+                    f'First reroute: t={pred["first_reroute"]:.1f}s',
                     ha='center', color=C_SOFT, fontsize=8, transform=ax_sum.transAxes)
 
-    plt.savefig('comparison.png', dpi=150, bbox_inches='tight', facecolor=fig.get_facecolor())
-    print('\nComparison chart saved as comparison.png')
-    plt.show()
+    fig.savefig(path, dpi=dpi, bbox_inches='tight', facecolor=fig.get_facecolor())
+    print(f'\nComparison chart saved as {path}')
+    if show:
+        plt.show()
+    return path
+
+
+def _render_one(job):
+    name, base, pred, out_dir, dpi = job
+    return _draw(base, pred, os.path.join(out_dir, f'{name}.png'), False, dpi)
+
+
+def render_reports(scenarios, out_dir='reports', processes=None, dpi=100):
+    """
+    Render comparison charts for many scenarios in parallel worker processes.
+
+    `scenarios` maps a name to a (baseline, predicted) pair, where each side is
+    a run_sim result or a list of them. Runs are reduced to figure-resolution
+    plot_data in the parent, so only those small arrays are pickled to the
+    workers, whatever the run length, seed count or topology size. Returns
+    the paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(name, *plot_pair(b, p, dpi), out_dir, dpi)
+            for name, (b, p) in scenarios.items()]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_render_one, jobs))
 
 
 if __name__ == '__main__':
@@ -310,4 +577,4 @@ if __name__ == '__main__':
         print(f'\n  ⚡  First reroute triggered at: t={predicted["reroute_times"][0]:.1f}s')
 
     print('\n  Generating comparison chart...')
-    plot_comparison(baseline, predicted)
\ No newline at end of file
+    plot_comparison(baseline, predicted, show=True)
\ No newline at end of file
@@ -19,6 +19,8 @@ class NodeMonitor:
         self.congestion_score = 0
         self.predicted = False   # True = heading toward congestion (early warning)
         self.congested = False   # True = actually congested (hard threshold breached)
+        self.predicted_events = 0  # Evaluations that ended in PREDICTED (monotonic)
+        self.congested_events = 0  # Evaluations that ended in CONGESTED (monotonic)
 
     def update(self, queue_length=None, delay=None, traffic_rate=None):
         """Update monitor with new values"""
@@ -59,6 +61,8 @@ class NodeMonitor:
             soft_score += 1
         # Predicted = soft thresholds triggered but hard not yet (still time to reroute)
         self.predicted = (soft_score >= 2) and not self.congested
+        self.predicted_events += self.predicted
+        self.congested_events += self.congested
 
         # Return True if ANY warning (predicted OR congested) — triggers rerouting
         return self.predicted or self.congested
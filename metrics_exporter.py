@@ -0,0 +1,178 @@
+"""
+metrics_exporter.py — OpenMetrics exporter for monitor state and routing
+
+Exposes the live simulation state in OpenMetrics text format, either as a
+one-shot text dump or over a local HTTP endpoint (/metrics):
+  - per-node gauges: queue length, delay, traffic rate
+  - per-node counters: PREDICTED / CONGESTED evaluations
+  - route-computation latency histogram
+  - route-cache hits/misses and reroute counts
+
+Nothing is copied and nothing is locked on the simulation path: gauges are
+read straight from the NodeMonitor objects when a scrape happens, and the
+router only bumps a few integers per route computation.
+"""
+
+import sys
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PREFIX       = 'ecp'    # Early Congestion Prediction
+DEFAULT_PORT = 9108
+
+# Route computation latency buckets (seconds)
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 5e-2, 0.1)
+
+
+class RouteStats:
+    """Counters a router updates on every route computation."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets        = buckets
+        self.bucket_counts  = [0] * (len(buckets) + 1)   # last slot = +Inf
+        self.latency_sum    = 0.0
+        self.latency_count  = 0
+        self.cache_hits     = 0
+        self.cache_misses   = 0
+        self.reroutes       = 0
+
+    def observe_latency(self, seconds):
+        self.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+        self.latency_sum   += seconds
+        self.latency_count += 1
+
+    def hit_ratio(self):
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+
+class MetricsExporter:
+    """Renders attached monitors and route stats as OpenMetrics text."""
+
+    def __init__(self):
+        self.sources = {}   # run label -> (monitors dict, RouteStats or None)
+        self.server  = None
+
+    def attach(self, run, monitors, route_stats=None):
+        """Expose a run's live monitors (and router stats) under label `run`."""
+        self.sources[run] = (monitors, route_stats)
+
+    def render(self):
+        # Snapshot the run list: attach() may add a run while a scrape renders
+        sources = list(self.sources.items())
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+            lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+            for suffix, labels, value in samples:
+                label_str = ','.join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f'{PREFIX}_{name}{suffix}{{{label_str}}} {value}')
+
+        def per_node(attr):
+            return [('', (('run', run), ('node', n)), getattr(m, attr))
+                    for run, (monitors, _) in sources
+                    for n, m in monitors.items()]
+
+        def per_run(fn):
+            return [('', (('run', run),), fn(stats))
+                    for run, (_, stats) in sources if stats is not None]
+
+        family('node_queue_length', 'gauge', 'Packets waiting in the node queue.',
+               per_node('queue_length'))
+        family('node_delay_seconds', 'gauge', 'Queueing delay at the node.',
+               per_node('delay'))
+        family('node_traffic_rate', 'gauge', 'Observed traffic rate (packets/sec).',
+               per_node('traffic_rate'))
+        family('node_predicted', 'counter', 'Evaluations that ended in PREDICTED state.',
+               [('_total', l, v) for _, l, v in per_node('predicted_events')])
+        family('node_congested', 'counter', 'Evaluations that ended in CONGESTED state.',
+               [('_total', l, v) for _, l, v in per_node('congested_events')])
+
+        latency = []
+        for run, (_, stats) in sources:
+            if stats is None:
+                continue
+            cumulative = 0
+            for bound, count in zip(stats.buckets + ('+Inf',), stats.bucket_counts):
+                cumulative += count
+                latency.append(('_bucket', (('run', run), ('le', bound)), cumulative))
+            latency.append(('_count', (('run', run),), stats.latency_count))
+            latency.append(('_sum',   (('run', run),), stats.latency_sum))
+        family('route_computation_seconds', 'histogram', 'Time spent computing the best path.',
+               latency)
+
+        family('route_cache_hits', 'counter', 'Best-path lookups served from the route cache.',
+               [('_total', l, v) for _, l, v in per_run(lambda s: s.cache_hits)])
+        family('route_cache_misses', 'counter', 'Best-path lookups that had to recompute.',
+               [('_total', l, v) for _, l, v in per_run(lambda s: s.cache_misses)])
+        family('route_cache_hit_ratio', 'gauge', 'Fraction of best-path lookups served from cache.',
+               per_run(RouteStats.hit_ratio))
+        family('reroutes', 'counter', 'Times the chosen path changed.',
+               [('_total', l, v) for _, l, v in per_run(lambda s: s.reroutes)])
+
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path=None):
+        """One-shot text dump: to `path` if given, otherwise to stdout."""
+        text = self.render()
+        if path is None:
+            sys.stdout.write(text)
+        else:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def serve(self, port=DEFAULT_PORT, host='127.0.0.1'):
+        """Serve /metrics from a background thread (scrapes never block the sim)."""
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f'Serving metrics at http://{host}:{self.server.server_port}/metrics')
+        return self.server
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+if __name__ == '__main__':
+    from compare import run_sim, RANDOM_SEED
+
+    exporter = MetricsExporter()
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    if port is not None:
+        exporter.serve(port)
+
+    run_sim(early_prediction=False, seed=RANDOM_SEED, exporter=exporter, run='baseline')
+    run_sim(early_prediction=True,  seed=RANDOM_SEED, exporter=exporter, run='predicted')
+
+    if port is None:
+        exporter.dump()
+    else:
+        print('Runs finished — press Ctrl+C to stop serving.')
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            exporter.stop()
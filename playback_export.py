@@ -0,0 +1,190 @@
+"""
+playback_export.py — Precomputed simulation playback for the web demo
+
+Records run_simulation tick by tick and writes a compact playback file that
+index.html streams and replays, so the browser never simulates or routes.
+
+File format (newline-delimited JSON, optionally gzip-compressed if the path
+ends in .gz — the demo decompresses it while streaming):
+  line 1   header: {"format", "version", "nodes", "edges", "pos", "src", "dst",
+                    "tick", "chunk_ticks", "delay_per_packet"}
+  line 2+  one chunk per line:
+           {"t0": time of first tick,
+            "q":  queues of every node at t0 (keyframe),
+            "s":  states at t0 (0 = OK, 1 = PREDICTED, 2 = CONGESTED),
+            "r":  chosen route at t0,
+            "d":  one entry per following tick: [dq, ds, r]
+                  dq = flat [node index, queue change, ...] for nodes that changed
+                  ds = flat [node index, new state, ...] for nodes that changed
+                  r  = new route, or null if unchanged}
+Edges and routes use node ids; the q / s arrays and deltas are indexed in
+header "nodes" order. Every chunk starts with a keyframe, so a player can
+start at any chunk.
+"""
+
+import gzip
+import json
+import math
+import sys
+
+import networkx as nx
+
+FORMAT      = 'ecp-playback'
+VERSION     = 1
+CHUNK_TICKS = 200   # Ticks per chunk line (one keyframe each)
+SPRING_LAYOUT_MAX = 500
+
+OK, PREDICTED, CONGESTED = 0, 1, 2
+
+# Same layout as the hand-placed topology in index.html
+DEMO_POS = {1: (0.08, 0.50), 2: (0.32, 0.15), 3: (0.32, 0.85),
+            4: (0.56, 0.50), 5: (0.80, 0.15), 6: (0.80, 0.85)}
+
+
+def node_state(monitor):
+    if monitor.congested:
+        return CONGESTED
+    if monitor.predicted:
+        return PREDICTED
+    return OK
+
+
+def layout(network):
+    """
+    Node positions scaled to [0.05, 0.95] (fractions of the canvas). Uses the
+    nodes' 'pos' attributes if every node has one; otherwise a spring layout,
+    or a circular layout for big graphs (spring layout needs scipy there).
+    """
+    if set(network.nodes()) == set(DEMO_POS):
+        return DEMO_POS
+    raw = nx.get_node_attributes(network, 'pos')
+    if len(raw) != network.number_of_nodes():
+        if network.number_of_nodes() < SPRING_LAYOUT_MAX:
+            raw = nx.spring_layout(network, seed=0)
+        else:
+            raw = nx.circular_layout(network)
+    xs = [p[0] for p in raw.values()]
+    ys = [p[1] for p in raw.values()]
+
+    def scale(v, lo, hi):
+        return 0.05 + 0.9 * (v - lo) / ((hi - lo) or 1)
+
+    return {n: (scale(x, min(xs), max(xs)), scale(y, min(ys), max(ys)))
+            for n, (x, y) in raw.items()}
+
+
+class PlaybackWriter:
+    """Streams per-tick simulation state to a chunked, delta-encoded file."""
+
+    def __init__(self, path, network, src=1, dst=6, tick=1.0, pos=None,
+                 chunk_ticks=CHUNK_TICKS, delay_per_packet=0.005):
+        pos = pos or layout(network)
+
+        self.path        = path
+        self.nodes       = list(network.nodes())
+        self.src         = src   # route endpoints recorded every tick
+        self.dst         = dst
+        self.chunk_ticks = chunk_ticks
+        self.file        = (gzip.open(path, 'wt', encoding='utf-8') if path.endswith('.gz')
+                            else open(path, 'w', encoding='utf-8'))
+        self.chunk       = None
+        self.prev        = None   # (queues, states, route) of the previous tick
+        self.ticks       = 0
+
+        self._write({
+            'format':           FORMAT,
+            'version':          VERSION,
+            'nodes':            self.nodes,
+            'edges':            [[u, v] for u, v in network.edges()],
+            'pos':              [[round(pos[n][0], 4), round(pos[n][1], 4)] for n in self.nodes],
+            'src':              src,
+            'dst':              dst,
+            'tick':             tick,
+            'chunk_ticks':      chunk_ticks,
+            'delay_per_packet': delay_per_packet,
+        })
+
+    def _write(self, obj):
+        self.file.write(json.dumps(obj, separators=(',', ':')) + '\n')
+
+    def record(self, time, monitors, route):
+        """Record one tick: every node's queue and state plus the chosen route."""
+        queues = [monitors[n].queue_length for n in self.nodes]
+        states = [node_state(monitors[n]) for n in self.nodes]
+        route  = list(route) if route else []
+
+        if self.chunk is None:
+            self.chunk = {'t0': round(time, 3), 'q': queues, 's': states, 'r': route, 'd': []}
+        else:
+            pq, ps, pr = self.prev
+            dq, ds = [], []
+            for i, (q, p) in enumerate(zip(queues, pq)):
+                if q != p:
+                    dq += (i, q - p)
+            for i, (s, p) in enumerate(zip(states, ps)):
+                if s != p:
+                    ds += (i, s)
+            self.chunk['d'].append([dq, ds, route if route != pr else None])
+
+        self.prev = (queues, states, route)
+        self.ticks += 1
+        if len(self.chunk['d']) + 1 >= self.chunk_ticks:
+            self.flush()
+
+    def flush(self):
+        if self.chunk is not None:
+            self._write(self.chunk)
+            self.chunk = None
+
+    def close(self):
+        self.flush()
+        self.file.close()
+        print(f'Playback saved as {self.path} ({self.ticks} ticks, {len(self.nodes)} nodes)')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def random_topology(n_nodes, seed=0):
+    """
+    Random geometric graph with nodes 1..n_nodes (matching
+    Workload.synthetic) and 'pos' attributes, so layout() needs no solver.
+    """
+    radius = 1.5 * math.sqrt(math.log(n_nodes) / (math.pi * n_nodes))
+    graph = nx.random_geometric_graph(n_nodes, radius, seed=seed)
+    return nx.relabel_nodes(graph, {n: n + 1 for n in graph})
+
+
+def export_playback(path='playback.ndjson', duration=300, seed=42,
+                    network=None, workload=None, src=1, dst=6):
+    """
+    Run the simulation and write its playback file for index.html. The same
+    `network` (default: the 6-node create_network() topology) is simulated
+    and written to the header; other topologies need a `workload`.
+    """
+    from network_setup import create_network
+    from simulation import run_simulation
+
+    if network is None:
+        network = create_network()
+    with PlaybackWriter(path, network, src=src, dst=dst) as writer:
+        run_simulation(duration=duration, seed=seed, playback=writer,
+                       network=network, workload=workload)
+    return path
+
+
+if __name__ == '__main__':
+    out      = sys.argv[1] if len(sys.argv) > 1 else 'playback.ndjson'
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 300
+    n_nodes  = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    if n_nodes is None:
+        export_playback(out, duration)
+    else:
+        # Large demo: random topology with a synthetic time-varying workload
+        from workload import Workload
+        export_playback(out, duration, network=random_topology(n_nodes),
+                        workload=Workload.synthetic(n_nodes, seed=42), src=1, dst=n_nodes)
@@ -0,0 +1,218 @@
+"""
+run_length.py — Adaptive run-length control
+
+Instead of guessing a fixed simulation duration, a run is advanced in steps
+and stopped once the key metrics are known precisely enough:
+  1. Warm-up is removed with MSER-5 truncation (the initial transient from
+     empty queues biases the averages).
+  2. The remaining steady-state series is split into batches and a 95%
+     confidence interval is built from the batch means. Batches must span
+     several correlation times of the series (and at least MIN_BATCH_SIZE
+     ticks), and the batch means must pass a lag-1 autocorrelation test,
+     otherwise the CI is too narrow and no precision is claimed.
+  3. The run stops when every metric's CI half-width is within the target
+     precision, or when the time budget runs out.
+"""
+
+import numpy as np
+
+# ── Defaults ─────────────────────────────────────────────────
+MSER_BATCH     = 5      # MSER-5: truncation is searched over batches of 5 ticks
+N_BATCHES      = 20     # Number of batch means used for the confidence interval
+MIN_BATCH_SIZE = 30     # Need at least this many ticks per batch to build a CI
+BATCH_TAU      = 5      # ...and at least this many correlation times per batch
+LAG1_Z         = 1.645  # One-sided 95% bound on the batch means' lag-1 autocorrelation
+REL_PRECISION  = 0.05   # Target CI half-width as a fraction of the mean (±5%)
+ABS_PRECISION  = 0.05   # ...or this absolute half-width (for means near zero)
+MIN_DURATION   = 20     # Never stop before this many simulated seconds
+MAX_DURATION   = 2000   # Budget: stop here even if precision was not reached
+CHECK_INTERVAL = 10     # Re-check precision every this many simulated seconds
+
+# Two-sided 95% Student-t quantiles, indexed by degrees of freedom
+_T_975 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+    8: 2.306, 9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160,
+    14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093,
+    20: 2.086, 25: 2.060, 30: 2.042,
+}
+
+
+def t_quantile(df):
+    """95% two-sided t quantile (falls back to the normal 1.96 for large df)."""
+    if df in _T_975:
+        return _T_975[df]
+    if df > 30:
+        return 1.96
+    # Between tabulated points — use the next lower df (conservative)
+    return _T_975[max(k for k in _T_975 if k < df)]
+
+
+def mser_truncation(series, batch_size=MSER_BATCH):
+    """
+    Return how many leading observations to discard as warm-up (MSER).
+    Picks the truncation point d that minimises the marginal standard error
+    of the remaining batch means: SSE(d) / (k - d)^2. Only the first half of
+    the series is considered, as is standard for MSER.
+    """
+    x = np.asarray(series, dtype=float)
+    k = len(x) // batch_size
+    if k < 2:
+        return 0
+
+    z = x[:k * batch_size].reshape(k, batch_size).mean(axis=1)
+
+    # Suffix sums so every candidate d is evaluated in one pass
+    s1 = np.cumsum(z[::-1])[::-1]
+    s2 = np.cumsum((z * z)[::-1])[::-1]
+    m  = np.arange(k, 0, -1, dtype=float)
+
+    d_max = k // 2
+    sse  = s2[:d_max + 1] - s1[:d_max + 1] ** 2 / m[:d_max + 1]
+    stat = sse / m[:d_max + 1] ** 2
+
+    return int(np.argmin(stat)) * batch_size
+
+
+def correlation_time(series):
+    """
+    Integrated autocorrelation time 1 + 2 * sum(rho_k) of `series` in ticks,
+    summing the autocorrelations until the first non-positive one.
+    """
+    x = np.asarray(series, dtype=float)
+    n = len(x)
+    x = x - x.mean() if n else x
+    var = float(x @ x)
+    if n < 2 or var == 0:
+        return 1.0
+
+    # Autocovariance via FFT, zero-padded to avoid wrap-around
+    f = np.fft.rfft(x, 2 * n)
+    acf = np.fft.irfft(f * np.conj(f))[:n // 2] / var
+    cut = np.flatnonzero(acf[1:] <= 0)
+    k = cut[0] + 1 if len(cut) else len(acf)
+    return float(max(1.0, 1.0 + 2.0 * acf[1:k].sum()))
+
+
+def lag1_autocorr(values):
+    """Lag-1 autocorrelation of `values` (0 for constant or too-short input)."""
+    x = np.asarray(values, dtype=float)
+    x = x - x.mean() if len(x) else x
+    var = float(x @ x)
+    if len(x) < 3 or var == 0:
+        return 0.0
+    return float(x[:-1] @ x[1:] / var)
+
+
+def batch_means(series, n_batches=N_BATCHES, min_batch_size=MIN_BATCH_SIZE):
+    """
+    Mean, 95% CI half-width and lag-1 autocorrelation of the batch means of
+    `series` (non-overlapping batches). Returns (mean, half_width, lag1);
+    half_width and lag1 are None if batches would be shorter than
+    `min_batch_size` ticks.
+    """
+    x = np.asarray(series, dtype=float)
+    size = len(x) // n_batches
+    if size < max(min_batch_size, 1):
+        return (float(x.mean()) if len(x) else 0.0), None, None
+
+    means = x[len(x) - size * n_batches:].reshape(n_batches, size).mean(axis=1)
+    half  = t_quantile(n_batches - 1) * means.std(ddof=1) / np.sqrt(n_batches)
+    return float(means.mean()), float(half), lag1_autocorr(means)
+
+
+class RunLengthController:
+    """Decides when a run has collected enough steady-state data to stop."""
+
+    def __init__(self, rel_precision=REL_PRECISION, abs_precision=ABS_PRECISION,
+                 min_duration=MIN_DURATION, max_duration=MAX_DURATION,
+                 check_interval=CHECK_INTERVAL, n_batches=N_BATCHES,
+                 min_batch_size=MIN_BATCH_SIZE, batch_tau=BATCH_TAU):
+        if n_batches < 2:
+            raise ValueError(f"n_batches must be at least 2 to build a CI, got {n_batches}")
+        self.rel_precision  = rel_precision
+        self.abs_precision  = abs_precision
+        self.min_duration   = min_duration
+        self.max_duration   = max_duration
+        self.check_interval = check_interval
+        self.n_batches      = n_batches
+        self.min_batch_size = min_batch_size
+        self.batch_tau      = batch_tau
+
+    def assess(self, series_by_metric, duration):
+        """Build a precision report for each metric's per-tick series."""
+        metrics = {}
+        for name, series in series_by_metric.items():
+            warmup = mser_truncation(series)
+            steady = series[warmup:]
+            tau    = correlation_time(steady)
+            min_size = max(self.min_batch_size, int(np.ceil(self.batch_tau * tau)))
+            mean, half, lag1 = batch_means(steady, self.n_batches, min_size)
+            target = max(self.rel_precision * abs(mean), self.abs_precision)
+            # Batch means must look uncorrelated for the t-interval to hold
+            lag1_max = LAG1_Z / np.sqrt(self.n_batches)
+            independent = lag1 is not None and lag1 <= lag1_max
+            metrics[name] = {
+                'mean':       mean,
+                'half_width': half,
+                'rel_half':   (half / abs(mean)) if half is not None and mean else None,
+                'warmup':     warmup,
+                'samples':    len(series) - warmup,
+                'corr_time':  tau,
+                'min_batch':  min_size,
+                'lag1':       lag1,
+                'correlated': lag1 is not None and not independent,
+                'converged':  half is not None and independent and half <= target,
+            }
+
+        return {
+            'duration':  duration,
+            'converged': bool(metrics) and all(m['converged'] for m in metrics.values()),
+            'metrics':   metrics,
+        }
+
+    def run(self, env, get_series):
+        """
+        Advance a SimPy environment in steps until every metric returned by
+        `get_series()` reaches the target precision or the budget runs out.
+        """
+        until = min(self.min_duration, self.max_duration)
+        while True:
+            env.run(until=until)
+            report = self.assess(get_series(), until)
+            if report['converged'] or until >= self.max_duration:
+                return report
+            until = min(until + self.check_interval, self.max_duration)
+
+
+def print_report(report):
+    """Print the achieved precision of an adaptive run."""
+    state = 'target precision reached' if report['converged'] else 'budget exhausted'
+    print(f"\n--- Run Length: {report['duration']:.0f}s simulated ({state}) ---")
+    for name, m in report['metrics'].items():
+        if m['half_width'] is None:
+            ci = f"n/a (too few samples for {m['min_batch']}-tick batches)"
+        elif m['correlated']:
+            ci = f"±{m['half_width']:.3f} (batch means correlated, lag-1={m['lag1']:.2f})"
+        elif m['rel_half'] is None:
+            ci = f"±{m['half_width']:.3f}"
+        else:
+            ci = f"±{m['half_width']:.3f} ({m['rel_half'] * 100:.1f}%)"
+        print(f"  {name:<12}: mean={m['mean']:.3f} {ci}, "
+              f"warm-up={m['warmup']}s, samples={m['samples']}, "
+              f"corr. time={m['corr_time']:.1f}s")
+
+
+if __name__ == '__main__':
+    print("--- Testing Run-Length Control ---\n")
+
+    rng = np.random.default_rng(42)
+    # Transient that decays to a noisy steady state around 5
+    t = np.arange(800)
+    series = 5 + 10 * np.exp(-t / 15) + rng.normal(0, 1, len(t))
+
+    print(f"MSER-5 warm-up truncation: {mser_truncation(series)} ticks")
+    mean, half, lag1 = batch_means(series[mser_truncation(series):], min_batch_size=10)
+    print(f"Steady-state mean: {mean:.3f} ± {half:.3f} (batch-mean lag-1 {lag1:.2f})")
+
+    controller = RunLengthController()
+    print_report(controller.assess({'queue': series}, len(series)))
@@ -1,37 +1,52 @@
+import math
 import simpy
-import random
 from network_setup import create_network
 from congestion_monitor import NodeMonitor
 from adaptive_routing import AdaptiveRouter
+from rng_streams import NodeStreams
+from run_length import RunLengthController, print_report
+from workload import drain_capacity
 
 TRAFFIC_RATES = {1: 5, 2: 15, 3: 5, 4: 12, 5: 5, 6: 5}
 
-# Drain rates calculated dynamically - 20-30% higher than arrival rate
-DRAIN_RATES = {}
-for node_id, rate in TRAFFIC_RATES.items():
-    # Drain 2-3 more than arrival rate to keep queues stable
-    DRAIN_RATES[node_id] = rate + 2
-    # For high-traffic nodes, add extra buffer
-    if rate > 10:
-        DRAIN_RATES[node_id] = rate + 3
+# Drain rates calculated dynamically - 2-3 more than arrival rate (see workload.py)
+DRAIN_RATES = drain_capacity(TRAFFIC_RATES)
 
 print(f"Dynamic drain rates: {DRAIN_RATES}")
 
+# Above this many nodes, per-node and per-path console output is skipped and
+# routing decisions use the Dijkstra router instead of path enumeration
+VERBOSE_NODES = 20
 
-def packet_generator(env, node_id, monitor, rate, results):
+
+def packet_generator(env, node_id, monitor, rates, results, rng, varying=False):
     """Simulates packets arriving at a node over time (arrival-only).
 
     Drain is handled by a separate periodic process so the simulation uses a
     consistent 1-second time granularity for comparisons (same model as
     `compare.py`).
+
+    `rates[node_id]` is read before every arrival. If `varying` is set the
+    rate may change every 1s tick, so an arrival gap that would cross a tick
+    boundary is redrawn there. This is exact for a piecewise-constant Poisson
+    rate provided the new rates are written before the generators wake at
+    the boundary, which run_simulation ensures by starting its drain process
+    first.
     """
     while True:
-        yield env.timeout(random.expovariate(rate))
+        rate = rates[node_id]
+        gap = rng.interarrival(node_id, rate) if rate > 0 else math.inf
+        if varying:
+            boundary = math.floor(env.now) + 1.0
+            if env.now + gap > boundary:
+                yield env.timeout(boundary - env.now)
+                continue
+        yield env.timeout(gap)
 
         monitor.queue_length += 1
 
         # Update instantaneous metrics (traffic rate has small noise)
-        monitor.traffic_rate = int(rate * 10) + random.randint(-3, 3)
+        monitor.traffic_rate = int(rate * 10) + rng.rate_noise(node_id)
         monitor.delay = monitor.queue_length * 0.005
         
         # Predict congestion after update
@@ -49,44 +64,89 @@ def packet_generator(env, node_id, monitor, rate, results):
         })
 
 
-def run_simulation(duration=50, seed=None):
+def run_simulation(duration=50, seed=None, precision=None, max_duration=None,
+                   playback=None, workload=None, exporter=None, run='simulation',
+                   network=None):
     """Run the full network simulation with early congestion prediction.
 
-    If `seed` is provided, the RNG is seeded for reproducible runs.
+    If `seed` is provided, every node's random streams are derived from it
+    for reproducible runs (see rng_streams.py).
+    If `precision` is provided (target relative CI half-width, e.g. 0.05),
+    `duration` is ignored and the run length is chosen adaptively: warm-up is
+    truncated (MSER-5) and the run stops once the per-node queue averages
+    reach that precision or `max_duration` runs out.
+    If `network` is provided it is simulated instead of the 6-node
+    create_network() topology; nodes other than 1-6 then need a `workload`.
+    If `playback` (a PlaybackWriter, built on the same network) is provided,
+    every node's queue and state plus the route between its src and dst are
+    recorded each tick for the web demo.
+    If `workload` (a workload.Workload over the network's nodes) is provided,
+    arrival rates change every tick instead of using TRAFFIC_RATES, and drain
+    capacity is derived from the workload's base rates.
+    If `exporter` (a MetricsExporter) is provided, the live monitors and the
+    router's latency stats are attached to it under the label `run`.
     """
-    if seed is not None:
-        random.seed(seed)
-
     print("=" * 55)
     print("  Early Congestion Prediction & Adaptive Routing Sim")
     print("=" * 55)
 
     env = simpy.Environment()
-    network = create_network()
+    if network is None:
+        network = create_network()
+    if playback is not None and set(playback.nodes) != set(network.nodes()):
+        raise ValueError('PlaybackWriter was built for a different network')
+    verbose = network.number_of_nodes() <= VERBOSE_NODES
     monitors = {n: NodeMonitor(n) for n in network.nodes()}
     router = AdaptiveRouter(network, monitors)
+    rng = NodeStreams(seed, network.nodes())
     results = []
-
-    traffic_rates = TRAFFIC_RATES  # Use the same rates defined above
-
-    print(f"\nStarting simulation for {duration} time units...")
-    print("Traffic rates per node:")
-    for nid, r in traffic_rates.items():
-        print(f"  Node {nid}: rate={r}")
+    queue_history = {n: [] for n in network.nodes()}  # per-tick queues (1s drain)
+    if exporter is not None:
+        exporter.attach(run, monitors, router.stats)
+
+    traffic_rates = dict(TRAFFIC_RATES)  # Use the same rates defined above
+    drain_rates = DRAIN_RATES
+    load = None
+    if workload is not None:
+        missing = set(network.nodes()) - set(workload.nodes)
+        if missing:
+            raise ValueError(f'Workload has no rates for nodes {sorted(missing)}')
+        traffic_rates = dict(zip(workload.nodes, workload.base_rates.tolist()))
+        drain_rates = drain_capacity(traffic_rates)
+        load = workload.stream()
+        # Tick 0 covers [0, 1); drain_and_record applies tick k at t=k
+        traffic_rates.update(zip(workload.nodes, next(load)[1].tolist()))
+    else:
+        missing = set(network.nodes()) - set(traffic_rates)
+        if missing:
+            raise ValueError(f'No traffic rates for nodes {sorted(missing)}; pass a workload')
+
+    if precision is None:
+        print(f"\nStarting simulation for {duration} time units...")
+    else:
+        print(f"\nStarting adaptive simulation (target precision ±{precision * 100:.0f}%)...")
+    if verbose:
+        print("Traffic rates per node:")
+        for nid, r in traffic_rates.items():
+            print(f"  Node {nid}: rate={r}")
+    else:
+        print(f"{network.number_of_nodes()} nodes, "
+              f"total base rate {sum(traffic_rates.values()):.0f} pkts/s")
     print(f"\nEarly prediction triggers at 60-70% of congestion thresholds\n")
 
-    for node_id, rate in traffic_rates.items():
-        env.process(packet_generator(env, node_id, monitors[node_id], rate, results))
-
     def drain_and_record():
         while True:
             yield env.timeout(1.0)
+            if load is not None:
+                _, rates = next(load)
+                traffic_rates.update(zip(workload.nodes, rates.tolist()))
             for n, monitor in monitors.items():
-                drain = random.randint(DRAIN_RATES[n] - 1, DRAIN_RATES[n] + 1)
+                drain = drain_rates[n] + rng.drain_jitter(n)
                 monitor.queue_length = max(0, monitor.queue_length - drain)
-                monitor.traffic_rate = int(traffic_rates[n] * 10) + random.randint(-3, 3)
+                monitor.traffic_rate = int(traffic_rates[n] * 10) + rng.rate_noise(n)
                 monitor.delay = monitor.queue_length * 0.005
                 monitor.predict_congestion()
+                queue_history[n].append(monitor.queue_length)
                 results.append({
                     'time': round(env.now, 3),
                     'node': n,
@@ -96,21 +156,48 @@ def run_simulation(duration=50, seed=None):
                     'predicted': monitor.predicted,
                     'congested': monitor.congested
                 })
+            if playback is not None:
+                playback.record(env.now, monitors, router.route(playback.src, playback.dst))
 
+    # Started first so that at every tick boundary the new rates are applied
+    # before any generator wakes up there and redraws its gap
     env.process(drain_and_record())
+    for node_id in network.nodes():
+        env.process(packet_generator(env, node_id, monitors[node_id], traffic_rates,
+                                     results, rng, varying=load is not None))
 
-    # Initial routing decision
-    prev_path = router.find_best_path(1, 6)
-    print(f"Initial path from Node 1 to Node 6: {prev_path}")
+    # Routing decisions are reported for the playback endpoints if recording
+    src, dst = (playback.src, playback.dst) if playback is not None else (1, 6)
 
-    env.run(until=duration)
+    def decide():
+        return router.find_best_path(src, dst) if verbose else router.route(src, dst)
 
-    print("\n--- Final Node Status ---")
-    for node_id, monitor in monitors.items():
-        monitor.report()
+    # Initial routing decision
+    prev_path = decide()
+    print(f"Initial path from Node {src} to Node {dst}: {prev_path}")
+
+    report = None
+    if precision is None:
+        env.run(until=duration)
+    else:
+        controller = RunLengthController(rel_precision=precision)
+        if max_duration is not None:
+            controller.max_duration = max_duration
+        report = controller.run(env, lambda: {f'queue_n{n}': q for n, q in queue_history.items()})
 
-    print("\n--- Adaptive Routing Decision (Node 1 to Node 6) ---")
-    final_path = router.find_best_path(1, 6)
+    print("\n--- Final Node Status ---")
+    if verbose:
+        for node_id, monitor in monitors.items():
+            monitor.report()
+    else:
+        print(f"{sum(m.predicted for m in monitors.values())} PREDICTED, "
+              f"{sum(m.congested for m in monitors.values())} CONGESTED "
+              f"of {len(monitors)} nodes")
+
+    print(f"\n--- Adaptive Routing Decision (Node {src} to Node {dst}) ---")
+    final_path = decide()
+    if not verbose:
+        print(f"Best path: {final_path}")
 
     predicted_events = sum(1 for r in results if r['predicted'])
     congested_events = sum(1 for r in results if r['congested'])
@@ -124,6 +211,9 @@ def run_simulation(duration=50, seed=None):
     if predicted_events > 0:
         print(f"Packets potentially saved by early prediction: ~{predicted_events // 2}")
 
+    if report is not None:
+        print_report(report)
+
     return results, monitors
 
 
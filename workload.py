@@ -0,0 +1,223 @@
+"""
+workload.py — Time-varying traffic workload generator
+
+Replaces the static TRAFFIC_RATES dict with load that changes every tick:
+  - Traffic matrix: gravity model, so a few heavy nodes exchange most of the
+    traffic (skewed source/destination pairs).
+  - Diurnal curve: sinusoidal daily cycle, optionally phase-shifted per node.
+  - Markov-modulated bursts: every node flips between NORMAL and BURST with
+    per-tick transition probabilities; bursts multiply the load.
+  - Heavy-tailed flow sizes: load arrives as flows with Pareto-distributed
+    sizes, so single ticks can carry large spikes. The default shape
+    (flow_alpha=2.5) keeps the variance finite; shapes in (1, 2] have
+    infinite variance and produce ticks hundreds of times the base rate.
+
+All of it is computed as whole (ticks x nodes) arrays, one block at a time,
+so hours of load for thousands of nodes stream in constant memory. Random
+draws are made in fixed chunks of DRAW_TICKS ticks, each seeded by its chunk
+index, so every call to blocks()/stream() replays the same load from the
+seed whatever the tick count or block_ticks; the baseline and
+early-prediction runs see identical traffic.
+
+The simulators consume per-node totals only (stream()/blocks()). The
+gravity-model traffic matrix and sample_pairs() describe how that load
+splits across source/destination pairs, but no run routes individual pairs.
+"""
+
+import itertools
+import time
+
+import numpy as np
+
+BLOCK_TICKS = 256     # Ticks yielded per block by blocks()
+DRAW_TICKS  = 256     # Ticks per independently seeded random-draw chunk
+DAY         = 86400   # Diurnal period (seconds)
+
+
+def drain_capacity(rates):
+    """
+    Per-node drain rate for the given arrival rates: 2 more than arrival so
+    queues stay stable, 3 more for high-traffic nodes (rate > 10).
+    """
+    drain = {}
+    for node_id, rate in rates.items():
+        rate = int(round(rate))
+        drain[node_id] = rate + 3 if rate > 10 else rate + 2
+    return drain
+
+
+class Workload:
+    """Streams per-tick arrival rates (packets/sec) for every node."""
+
+    def __init__(self, base_rates, nodes=None, seed=None, tick=1.0,
+                 diurnal_amplitude=0.5, diurnal_period=DAY, phase_spread=0.0, start=0.0,
+                 burst_on=0.02, burst_off=0.2, burst_factor=3.0,
+                 flow_size=5.0, flow_alpha=2.5, block_ticks=BLOCK_TICKS):
+        if flow_alpha <= 1:
+            raise ValueError(f'flow_alpha must be > 1 for a finite mean flow size, got {flow_alpha}')
+        self.base_rates = np.asarray(base_rates, dtype=float)
+        self.nodes      = list(nodes) if nodes is not None else list(range(len(self.base_rates)))
+        self.seed       = np.random.SeedSequence(seed)
+        self.tick       = tick
+        self.start      = start
+        self.block_ticks = block_ticks
+
+        # Diurnal curve: 1 + A*sin(2*pi*t/period + phase)
+        self.diurnal_amplitude = diurnal_amplitude
+        self.diurnal_period    = diurnal_period
+        self.phase = self._rng((0,)).uniform(0, phase_spread * 2 * np.pi, len(self.nodes))
+
+        # Two-state Markov chain per node; normalised so the long-run mean
+        # load stays at base_rates * diurnal
+        self.burst_on     = burst_on
+        self.burst_off    = burst_off
+        self.burst_factor = burst_factor
+        on_share = burst_on / (burst_on + burst_off) if burst_on + burst_off else 0.0
+        self.burst_norm = 1.0 / (1.0 + on_share * (burst_factor - 1.0))
+
+        # Pareto flow sizes (packets) with the requested mean
+        self.flow_alpha = flow_alpha
+        self.flow_min   = flow_size * (flow_alpha - 1) / flow_alpha
+
+    def _rng(self, purpose):
+        """Fresh Generator for one purpose (0 = phases, 1 = load chunks, 2 = pairs)."""
+        return np.random.default_rng(np.random.SeedSequence(self.seed.entropy, spawn_key=purpose))
+
+    @classmethod
+    def from_rates(cls, rates, **kwargs):
+        """Workload around a {node_id: rate} dict such as TRAFFIC_RATES."""
+        return cls(list(rates.values()), nodes=list(rates), **kwargs)
+
+    @classmethod
+    def synthetic(cls, n_nodes, mean_rate=8.0, skew=1.2, seed=None, **kwargs):
+        """
+        Workload for `n_nodes` nodes whose base rates follow a heavy-tailed
+        (Pareto, shape `skew`) distribution averaging `mean_rate`.
+        """
+        weights = np.random.default_rng(seed).pareto(skew, n_nodes) + 1.0
+        rates = weights * (mean_rate * n_nodes / weights.sum())
+        return cls(rates, nodes=range(1, n_nodes + 1), seed=seed, **kwargs)
+
+    # ── Traffic matrix ───────────────────────────────────────
+    def _gravity_weights(self):
+        """Base rates as gravity weights; needs two sending nodes to form pairs."""
+        w = self.base_rates
+        if (w < 0).any() or np.count_nonzero(w) < 2:
+            raise ValueError('Gravity model needs non-negative base rates on at least '
+                             f'two nodes, got {np.count_nonzero(w > 0)} positive')
+        return w
+
+    def traffic_matrix(self, rates=None):
+        """
+        Gravity-model traffic matrix T[i, j] (packets/sec from node i to j):
+        each node sends its rate to the others in proportion to their weight.
+        Row sums equal `rates` (default: base rates). O(nodes^2) memory — for
+        large topologies use sample_pairs instead.
+        """
+        rates = self.base_rates if rates is None else np.asarray(rates, dtype=float)
+        w = self._gravity_weights()
+        share = np.outer(np.ones_like(w), w)
+        np.fill_diagonal(share, 0.0)
+        share /= share.sum(axis=1, keepdims=True)
+        return rates[:, None] * share
+
+    def sample_pairs(self, k):
+        """Draw `k` (source, destination) node pairs from the gravity model."""
+        rng = self._rng((2,))
+        w = self._gravity_weights()
+        p = w / w.sum()
+        src = rng.choice(len(p), size=k, p=p)
+        dst = rng.choice(len(p), size=k, p=p)
+        clash = src == dst
+        while clash.any():
+            dst[clash] = rng.choice(len(p), size=int(clash.sum()), p=p)
+            clash = src == dst
+        nodes = np.asarray(self.nodes)
+        return np.column_stack((nodes[src], nodes[dst]))
+
+    # ── Time-varying rates ───────────────────────────────────
+    def expected_rates(self, times):
+        """Deterministic part of the load (base x diurnal), shape (ticks, nodes)."""
+        angle = 2 * np.pi * np.asarray(times)[:, None] / self.diurnal_period + self.phase
+        return self.base_rates * (1.0 + self.diurnal_amplitude * np.sin(angle))
+
+    def _bursts(self, rng, bursting, ticks):
+        """Advance the per-node Markov chains `ticks` steps, shape (ticks, nodes)."""
+        u = rng.random((ticks, len(self.nodes)))
+        states = np.empty((ticks, len(self.nodes)), dtype=bool)
+        s = bursting
+        for i in range(ticks):
+            s = np.where(s, u[i] >= self.burst_off, u[i] < self.burst_on)
+            states[i] = s
+        return states
+
+    def _flows(self, rng, mean_packets):
+        """Packets per (tick, node) made of Pareto-sized flows with the given means."""
+        mean_flows = mean_packets / (self.flow_min * self.flow_alpha / (self.flow_alpha - 1))
+        flows = rng.poisson(mean_flows)
+        sizes = (rng.pareto(self.flow_alpha, int(flows.sum())) + 1.0) * self.flow_min
+        owner = np.repeat(np.arange(flows.size), flows.ravel())
+        return np.bincount(owner, weights=sizes, minlength=flows.size).reshape(flows.shape)
+
+    def _chunks(self):
+        """Endless full DRAW_TICKS chunks of (times, rates), chunk c seeded by c."""
+        bursting = np.zeros(len(self.nodes), dtype=bool)
+        for c in itertools.count():
+            rng = self._rng((1, c))
+            times = self.start + (c * DRAW_TICKS + np.arange(DRAW_TICKS)) * self.tick
+            states = self._bursts(rng, bursting, DRAW_TICKS)
+            bursting = states[-1]
+            load = self.expected_rates(times) * self.burst_norm
+            load = np.where(states, load * self.burst_factor, load)
+            yield times, self._flows(rng, load * self.tick) / self.tick
+
+    def blocks(self, ticks=None):
+        """
+        Yield (times, rates) blocks: times has shape (b,), rates (b, nodes) in
+        packets/sec. Runs forever if `ticks` is None.
+        """
+        chunks = self._chunks()
+        times, rates = next(chunks)
+        done = 0
+        while ticks is None or done < ticks:
+            b = self.block_ticks if ticks is None else min(self.block_ticks, ticks - done)
+            while len(times) < b:
+                t, r = next(chunks)
+                times, rates = np.concatenate((times, t)), np.concatenate((rates, r))
+            yield times[:b], rates[:b]
+            times, rates = times[b:], rates[b:]
+            done += b
+
+    def stream(self, ticks=None):
+        """Yield (time, rates) one tick at a time; rates has one entry per node."""
+        for times, rates in self.blocks(ticks):
+            yield from zip(times.tolist(), rates)
+
+
+if __name__ == '__main__':
+    print("--- Testing Workload Generator ---\n")
+
+    from simulation import TRAFFIC_RATES
+    small = Workload.from_rates(TRAFFIC_RATES, seed=42)
+    print("Traffic matrix for the 6-node network (pkts/s):")
+    print(np.round(small.traffic_matrix(), 2))
+    print(f"Drain capacity: {drain_capacity(TRAFFIC_RATES)}\n")
+
+    n_nodes, hours = 5000, 2
+    wl = Workload.synthetic(n_nodes, seed=42, phase_spread=0.25)
+    start = time.perf_counter()
+    total = peak = 0.0
+    ticks = 0
+    for times, rates in wl.blocks(hours * 3600):
+        per_tick = rates.sum(axis=1)
+        total += per_tick.sum()
+        peak = max(peak, rates.max())
+        ticks += len(times)
+    elapsed = time.perf_counter() - start
+
+    top = np.sort(wl.base_rates)[::-1]
+    print(f"{n_nodes} nodes x {ticks} ticks ({hours}h) generated in {elapsed:.1f}s")
+    print(f"  Mean network load : {total / ticks:.0f} pkts/s (base {wl.base_rates.sum():.0f})")
+    print(f"  Peak node rate    : {peak:.0f} pkts/s")
+    print(f"  Top 1% nodes carry: {top[:n_nodes // 100].sum() / top.sum() * 100:.0f}% of base load")
+    print(f"  Sample pairs      : {wl.sample_pairs(3).tolist()}")